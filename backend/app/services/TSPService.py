@@ -4,7 +4,7 @@ This service currently implements a simple, deterministic compute_tours()
 method which creates `Tour` objects saved into `app.state`.
 """
 
-from typing import List, Set, Dict, Any, Tuple, cast
+from typing import List, Set, Dict, Tuple
 
 import networkx as nx
 
@@ -18,12 +18,12 @@ class TSPService:
         pass
 
     def _build_nx_graph_from_map(self, mp: Map) -> nx.DiGraph:
-        G = nx.DiGraph()
-        # add nodes
-        for inter in mp.intersections:
-            node_id = getattr(inter, "id", inter)
-            G.add_node(str(node_id))
-        # add edges
+        node_ids = [str(getattr(inter, "id", inter)) for inter in mp.intersections]
+        node_set = set(node_ids)
+
+        # Resolve parallel segments first, keeping the smallest weight per
+        # directed pair, then insert everything in bulk
+        best_edges: Dict[Tuple[str, str], float] = {}
         for seg in mp.road_segments:
             start_id = getattr(seg.start, "id", seg.start)
             end_id = getattr(seg.end, "id", seg.end)
@@ -31,46 +31,16 @@ class TSPService:
                 weight = float(seg.length_m)
             except Exception:
                 weight = float("inf")
-            if start_id in G.nodes and end_id in G.nodes:
-                prev = G.get_edge_data(start_id, end_id, default=None)
-                if prev is None or weight < prev.get("weight", float("inf")):
-                    G.add_edge(
-                        str(start_id),
-                        str(end_id),
-                        weight=weight
-                    )
-        return G
+            if start_id in node_set and end_id in node_set:
+                key = (str(start_id), str(end_id))
+                prev = best_edges.get(key)
+                if prev is None or weight < prev:
+                    best_edges[key] = weight
 
-    def _build_sp_graph(self, G_map: nx.DiGraph, nodes_list: List[str]):
-        sp_graph: Dict[str, Dict[str, Dict[str, Any]]] = {}
-        for src in nodes_list:
-            try:
-                # single_source_dijkstra returns (lengths_dict, paths_dict)
-                lengths_raw, paths_raw = nx.single_source_dijkstra(
-                    G_map, src, weight="weight"
-                )
-                # cast to expected typing to satisfy static checkers
-                lengths: Dict[str, float] = cast(Dict[str, float], lengths_raw)
-                paths: Dict[str, List[str]] = cast(Dict[str, List[str]], paths_raw)
-            except Exception:
-                lengths = {}
-                paths = {}
-
-            sp_graph[src] = {}
-            for tgt in nodes_list:
-                if tgt == src:
-                    sp_graph[src][tgt] = {"path": [src], "cost": 0.0}
-                else:
-                    # ensure we use string keys
-                    key = str(tgt)
-                    cost_value = (
-                        lengths.get(key, float("inf"))
-                        if isinstance(lengths, dict)
-                        else float("inf")
-                    )
-                    path_value = paths.get(key) if isinstance(paths, dict) else None
-                    sp_graph[src][tgt] = {"path": path_value, "cost": cost_value}
-        return sp_graph
+        G = nx.DiGraph()
+        G.add_nodes_from(node_ids)
+        G.add_weighted_edges_from((u, v, w) for (u, v), w in best_edges.items())
+        return G
 
     def _find_warehouse_for_courier(self, mp: Map, courier_id: str, map_nodes: Set[str]) -> str | None:
         # sourcery skip: use-next
@@ -132,13 +102,9 @@ class TSPService:
 
     def _build_nodes_set_from_tour(self, tour: Tour) -> List[str]:
         """Extract unique ordered nodes from tour deliveries."""
-        nodes_set = []
-        for pickup, delivery in tour.deliveries:
-            if pickup not in nodes_set:
-                nodes_set.append(pickup)
-            if delivery not in nodes_set:
-                nodes_set.append(delivery)
-        return nodes_set
+        return list(dict.fromkeys(
+            node for pickup, delivery in tour.deliveries for node in (pickup, delivery)
+        ))
 
     def _solve_tsp_for_tour(self, tsp: TSP, tour: Tour, depot_node: str | None, nodes_set: List[str]) -> Tuple[List[str], float]:
         """Solve TSP for a given tour."""
@@ -201,11 +167,12 @@ class TSPService:
         # Solve TSP
         compact_tour, compact_cost = self._solve_tsp_for_tour(tsp, tour, depot_node, nodes_set)
 
-        # Build shortest path graph for expansion
+        # Shortest paths for expansion: the solver already computed them for
+        # these nodes, so this only runs Dijkstra again if solving failed
         expansion_nodes = list(nodes_set)
         if depot_node and depot_node not in expansion_nodes:
             expansion_nodes.append(depot_node)
-        sp_graph = self._build_sp_graph(G_map, expansion_nodes)
+        sp_graph = tsp._get_shortest_paths(G_map, expansion_nodes)
 
         # Expand tour to full route
         full_route, full_cost = self._expand_tour_route(tsp, compact_tour, sp_graph, compact_cost)
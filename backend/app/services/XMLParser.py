@@ -1,4 +1,5 @@
 from typing import List, Optional
+import io
 import os
 import xml.etree.ElementTree as ET
 
@@ -76,43 +77,64 @@ class XMLParser:
         """
         # allow passing either an XML string or a path to an XML file
         if isinstance(xml_text, str) and os.path.isfile(xml_text):
-            tree = ET.parse(xml_text)
-            root: ET.Element = tree.getroot()
+            source = xml_text
+        elif isinstance(xml_text, bytes):
+            source = io.BytesIO(xml_text)
         else:
-            root: ET.Element = ET.fromstring(xml_text)
-
-        # --- 1) Intersections ---
+            source = io.StringIO(xml_text)
+
+        # Stream the document instead of building the whole element tree.
+        # Only direct children of the root are map entries, as with
+        # `root.findall`; each one is read on its closing tag and then
+        # removed from the root so memory stays bounded when parsing a file.
+        # Segments are resolved once every node is known, since a troncon may
+        # come before the noeud elements it references.
         intersections: List[Intersection] = []
         inter_by_id: dict = {}
-        for node_elem in root.findall('noeud'):
-            node_id = node_elem.get('id')
-            if node_id is None:
-                raise ValueError('noeud element missing id attribute')
-            lat_attr = node_elem.get('latitude')
-            lon_attr = node_elem.get('longitude')
-            latitude = float(lat_attr) if lat_attr is not None else 0.0
-            longitude = float(lon_attr) if lon_attr is not None else 0.0
-
-            node = Intersection(
-                id=node_id,
-                latitude=latitude,
-                longitude=longitude,
-            )
-            intersections.append(node)
-            inter_by_id[str(node_id)] = node
+        troncons: List[dict] = []
+        root = None
+        depth = 0
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            if elem.tag == 'noeud':
+                node_id = elem.get('id')
+                if node_id is None:
+                    raise ValueError('noeud element missing id attribute')
+                lat_attr = elem.get('latitude')
+                lon_attr = elem.get('longitude')
+                latitude = float(lat_attr) if lat_attr is not None else 0.0
+                longitude = float(lon_attr) if lon_attr is not None else 0.0
+
+                node = Intersection(
+                    id=node_id,
+                    latitude=latitude,
+                    longitude=longitude,
+                )
+                intersections.append(node)
+                inter_by_id[str(node_id)] = node
+            elif elem.tag == 'troncon':
+                troncons.append(dict(elem.attrib))
+            root.remove(elem)
 
         road_segments: List[RoadSegment] = []
-        for edge_elem in root.findall('troncon'):
-            origine = edge_elem.get('origine')
-            destination = edge_elem.get('destination')
+        for edge_attrs in troncons:
+            origine = edge_attrs.get('origine')
+            destination = edge_attrs.get('destination')
             if origine is None or destination is None:
                 raise ValueError('troncon element missing origine or destination attribute')
 
-            longueur_attr = edge_elem.get('longueur')
+            longueur_attr = edge_attrs.get('longueur')
             length_m = float(longueur_attr) if longueur_attr is not None else 0.0
             # compute travel time in seconds from length and default speed (km/h)
             travel_time_s = int(round(length_m / (DEFAULT_SPEED_KMH * 1000 / 3600))) if DEFAULT_SPEED_KMH != 0 else 0
-            street_name = edge_elem.get('nomRue') or ''
+            street_name = edge_attrs.get('nomRue') or ''
 
             # map start/end ids to Intersection objects (raise if missing)
             try:
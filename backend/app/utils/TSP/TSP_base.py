@@ -9,13 +9,30 @@ This module contains the core TSP class with methods for:
 
 import os
 import sys
-from typing import Dict, List, cast
+from collections import OrderedDict
+from typing import Dict, List, Tuple, cast
 
 import networkx as nx
 
 
 class TSPBase:
-    """Base class for TSP solver with graph construction utilities."""
+    """Base class for TSP solver with graph construction utilities.
+    
+    Map graphs parsed from XML are cached in `_xml_cache` and the same graph
+    object is handed to every instance that loads the same unmodified file, so
+    callers must treat them as read-only: mutating one in place would leak into
+    every other solver, and into the shortest-path tables cached for it.
+    """
+
+    # Graphs built from XML files, shared by all instances, least recently
+    # used first. Keyed by (absolute path, modification time) so an edited file
+    # is reparsed; only the newest version of each path is kept, and at most
+    # `_xml_cache_size` files overall.
+    _xml_cache: "OrderedDict[Tuple[str, float], Tuple[nx.DiGraph, List[str]]]" = OrderedDict()
+    _xml_cache_size = 8
+
+    # Number of pairwise shortest-path tables kept per map graph
+    _sp_cache_size = 16
 
     def __init__(self):
         """Initialize TSP solver with caching for map graph."""
@@ -23,6 +40,12 @@ class TSPBase:
         # on repeated calls to `solve()`.
         self.graph = None
         self._all_nodes = None
+        # Recent pairwise shortest-path tables keyed by node set, least
+        # recently used first, for the map graph in `_sp_cache_graph`. Shared
+        # by `solve()` and route expansion, and by repeated solves of the
+        # same tours.
+        self._sp_graph_cache: "OrderedDict[frozenset, Dict]" = OrderedDict()
+        self._sp_cache_graph = None
 
     def _build_networkx_map_graph(self, xml_file_path: str | None = None):
         """Parse the XML map and return a directed NetworkX graph and the node list.
@@ -36,7 +59,8 @@ class TSPBase:
             Tuple of (NetworkX DiGraph, list of node IDs)
         """
         # If no explicit xml path is provided and we have a cached graph,
-        # reuse it. If an xml path is provided, always rebuild from that file.
+        # reuse it. If an xml path is provided, rebuild from that file unless
+        # the same unmodified file was already parsed (see `_xml_cache`).
         if xml_file_path is None and self.graph is not None:
             return self.graph, (
                 list(self._all_nodes)
@@ -51,8 +75,18 @@ class TSPBase:
                 project_root, "fichiersXMLPickupDelivery", "petitPlan.xml"
             )
 
-        with open(xml_file_path, "r", encoding="utf-8") as f:
-            xml_text = f.read()
+        try:
+            cache_key = (
+                os.path.abspath(xml_file_path), os.path.getmtime(xml_file_path)
+            )
+        except OSError:
+            cache_key = None
+        xml_cache = TSPBase._xml_cache
+        if cache_key is not None and cache_key in xml_cache:
+            xml_cache.move_to_end(cache_key)
+            self.graph, cached_nodes = xml_cache[cache_key]
+            self._all_nodes = list(cached_nodes)
+            return self.graph, list(cached_nodes)
 
         # lazy import to avoid circular imports (app.services may import this module)
         try:
@@ -64,37 +98,53 @@ class TSPBase:
             )
             from services.XMLParser import XMLParser  # type: ignore
 
-        map_data = XMLParser.parse_map(xml_text)
+        if not os.path.isfile(xml_file_path):
+            raise FileNotFoundError(f"Map file not found: {xml_file_path}")
+        # Hand over the path so the parser streams the file from disk
+        map_data = XMLParser.parse_map(xml_file_path)
 
-        G = nx.DiGraph()
-        # Add nodes (use intersection ids as strings). Accept either
-        # Intersection objects or raw id strings in the parsed data.
-        for inter in map_data.intersections:
-            node_id = getattr(inter, "id", inter)
-            G.add_node(str(node_id))
-
-        # Add directed edges with weight = length_m. Accept both
-        # RoadSegment.start/end as Intersection objects or plain ids.
+        # Node ids as strings. Accept either Intersection objects or raw id
+        # strings in the parsed data.
+        node_ids = [str(getattr(inter, "id", inter)) for inter in map_data.intersections]
+        node_set = set(node_ids)
+
+        # Resolve parallel segments first, keeping the smallest weight per
+        # directed pair. Accept both RoadSegment.start/end as Intersection
+        # objects or plain ids.
+        best_edges: Dict[Tuple[str, str], Tuple[float, str]] = {}
         for seg in map_data.road_segments:
             start_id = getattr(seg.start, "id", seg.start)
             end_id = getattr(seg.end, "id", seg.end)
+            if start_id not in node_set or end_id not in node_set:
+                continue
             try:
                 weight = float(seg.length_m)
             except Exception:
                 weight = float("inf")
-            # If node ids are present, add the edge
-            if start_id in G.nodes and end_id in G.nodes:
-                # If multiple edges exist, keep the smallest weight
-                prev = G.get_edge_data(start_id, end_id, default=None)
-                if prev is None or weight < prev.get("weight", float("inf")):
-                    G.add_edge(
-                        str(start_id), str(end_id), weight=weight, street_name=seg.street_name
-                    )
+            key = (str(start_id), str(end_id))
+            prev = best_edges.get(key)
+            if prev is None or weight < prev[0]:
+                best_edges[key] = (weight, seg.street_name)
+
+        # Insert everything in bulk rather than edge by edge
+        G = nx.DiGraph()
+        G.add_nodes_from(node_ids)
+        G.add_edges_from(
+            (u, v, {"weight": weight, "street_name": street_name})
+            for (u, v), (weight, street_name) in best_edges.items()
+        )
 
         # Cache the built graph for subsequent calls when no explicit
         # xml_file_path is provided.
         self.graph = G
         self._all_nodes = list(G.nodes())
+        if cache_key is not None:
+            # Drop graphs of older versions of this file before caching it
+            for key in [key for key in xml_cache if key[0] == cache_key[0]]:
+                del xml_cache[key]
+            xml_cache[cache_key] = (G, list(self._all_nodes))
+            while len(xml_cache) > self._xml_cache_size:
+                xml_cache.popitem(last=False)
         return G, list(self._all_nodes)
 
     def expand_tour_with_paths(self, tour: List[str], sp_graph: Dict):
@@ -7,8 +7,11 @@ This module provides various constructive heuristics for building initial TSP to
 - Insertion Heuristic
 """
 
+import heapq
 import networkx as nx
-from typing import List, Tuple, Set, Dict, Callable, Optional
+from typing import List, Tuple, Set, Dict, Callable, Optional, Union
+
+from .TSP_metric import MetricGraphBuilder
 
 
 class TourHeuristics:
@@ -16,7 +19,7 @@ class TourHeuristics:
 
     @staticmethod
     def build_nearest_neighbor_tour(
-        G: nx.Graph,
+        G: Union[nx.Graph, Dict[str, Dict[str, float]]],
         pickups: List[str],
         deliveries: List[str],
         delivery_map: Dict[str, str],
@@ -27,7 +30,7 @@ class TourHeuristics:
         """Build tour by nearest neighbor, considering all unvisited nodes.
         
         Args:
-            G: Metric graph with nodes and edge weights
+            G: Metric graph, or its weights[u][v] lookup
             pickups: List of pickup nodes
             deliveries: List of delivery nodes
             delivery_map: Maps delivery nodes to their required pickup nodes
@@ -42,12 +45,15 @@ class TourHeuristics:
         best_tour = None
         best_cost = INF
         
+        # Flat distance rows so each step is a single C-level min() over candidates
+        dist = MetricGraphBuilder.weight_lookup(G)
+        
         for start_pickup in pickups[:3]:  # Try first 3 pickups as starts
-            if start_pickup not in G.nodes():
+            if start_pickup not in dist:
                 continue
                 
             unvisited = set(pickups + deliveries)
-            if start_node is not None and start_node in G.nodes():
+            if start_node is not None and start_node in dist:
                 current = start_node
                 route = [start_node]
                 # Need to add the first pickup and remove from unvisited
@@ -60,36 +66,36 @@ class TourHeuristics:
                 route = [start_pickup]
                 unvisited.discard(start_pickup)
             
+            # A delivery can only be visited once its pickup has been: keep the
+            # currently allowed nodes in `available` and release deliveries as
+            # their pickups are visited, instead of rescanning `unvisited`
+            waiting: Dict[str, List[str]] = {}
+            for node in unvisited:
+                pickup = delivery_map.get(node)
+                if pickup is not None and pickup in unvisited:
+                    waiting.setdefault(pickup, []).append(node)
+            available = unvisited.difference(
+                node for blocked in waiting.values() for node in blocked
+            )
+            
             while unvisited:
                 # Find nearest node that maintains precedence
-                best_next = None
-                best_dist = INF
-                
-                for node in unvisited:
-                    # Check if we can visit this node (precedence)
-                    can_visit = True
-                    if node in deliveries:
-                        # Check if pickup was already visited
-                        req_pickup = delivery_map[node]
-                        if req_pickup in unvisited:
-                            can_visit = False
-                    
-                    if can_visit:
-                        dist = G[current][node]["weight"]
-                        if dist < best_dist:
-                            best_dist = dist
-                            best_next = node
-                
-                if best_next is None:
+                if available:
+                    best_next = min(available, key=dist[current].__getitem__)
+                else:
                     # Forced to add remaining (shouldn't happen with valid precedence)
-                    best_next = list(unvisited)[0]
+                    best_next = next(iter(unvisited))
                 
                 route.append(best_next)
                 unvisited.discard(best_next)
+                available.discard(best_next)
+                available.update(
+                    node for node in waiting.pop(best_next, ()) if node in unvisited
+                )
                 current = best_next
             
             # Close tour
-            if start_node is not None and start_node in G.nodes():
+            if start_node is not None and start_node in dist:
                 if route[-1] != start_node:
                     route.append(start_node)
             else:
@@ -106,7 +112,7 @@ class TourHeuristics:
 
     @staticmethod
     def build_savings_tour(
-        G: nx.Graph,
+        G: Union[nx.Graph, Dict[str, Dict[str, float]]],
         pd_pairs: List[Tuple[str, str]],
         tour_cost_fn: Callable[[List[str]], float],
         is_valid_tour_fn: Callable[[List[str]], bool],
@@ -115,7 +121,7 @@ class TourHeuristics:
         """Build tour using Clarke-Wright savings heuristic adapted for precedence.
         
         Args:
-            G: Metric graph with nodes and edge weights
+            G: Metric graph, or its weights[u][v] lookup
             pd_pairs: List of (pickup, delivery) tuples
             tour_cost_fn: Function to compute tour cost
             is_valid_tour_fn: Function to validate tour precedence constraints
@@ -125,35 +131,42 @@ class TourHeuristics:
             Tuple of (tour_sequence, tour_cost)
         """
         INF = float("inf")
+        dist = MetricGraphBuilder.weight_lookup(G)
         # Start with individual pickup->delivery routes
         routes = []
         pickups = [p for p, _ in pd_pairs]
-        depot = start_node if start_node and start_node in G.nodes() else pickups[0]
+        depot = start_node if start_node and start_node in dist else pickups[0]
         
         for p, d in pd_pairs:
-            if p in G.nodes() and d in G.nodes():
+            if p in dist and d in dist:
                 routes.append([p, d])
         
-        # Calculate savings for merging routes
+        # Calculate savings for merging routes:
+        # depot -> route_i -> route_j -> depot saves
+        # dist(i_end, depot) + dist(depot, j_start) - dist(i_end, j_start).
+        # The metric is symmetric, so the depot row serves both depot terms.
         savings = []
-        for i in range(len(routes)):
-            for j in range(i + 1, len(routes)):
-                route_i, route_j = routes[i], routes[j]
-                # Try merging: depot -> route_i -> route_j -> depot
-                # Savings = dist(i_end, depot) + dist(depot, j_start) - dist(i_end, j_start)
+        if len(routes) > 1:
+            depot_row = dist[depot]
+            starts = [route[0] for route in routes]
+            for i, route_i in enumerate(routes[:-1]):
                 i_end = route_i[-1]
-                j_start = route_j[0]
-                s = (G[i_end][depot]["weight"] + G[depot][j_start]["weight"] - 
-                     G[i_end][j_start]["weight"])
-                savings.append((s, i, j))
+                end_row = dist[i_end]
+                end_to_depot = depot_row[i_end]
+                savings.extend(
+                    (end_to_depot + depot_row[j_start] - end_row[j_start], i, j)
+                    for j, j_start in enumerate(starts[i + 1:], i + 1)
+                )
         
-        savings.sort(reverse=True)
+        # Only the best len(routes)//2 merges are tried, so select them without
+        # sorting the whole list (same order as sort(reverse=True)[:k])
+        top_savings = heapq.nlargest(len(routes) // 2, savings)
         
         # Merge routes greedily with precedence checks
         merged = [False] * len(routes)
         final_route = []
         
-        for s, i, j in savings[:len(routes)//2]:  # Limit merges
+        for s, i, j in top_savings:  # Limit merges
             if not merged[i] and not merged[j]:
                 # Merge route_j into route_i
                 merged_route = routes[i] + routes[j]
@@ -171,7 +184,7 @@ class TourHeuristics:
             return [], INF
         
         # Add depot if needed
-        if start_node and start_node in G.nodes():
+        if start_node and start_node in dist:
             final_route = [start_node] + final_route + [start_node]
         else:
             final_route.append(final_route[0])
@@ -181,7 +194,7 @@ class TourHeuristics:
 
     @staticmethod
     def build_insertion_tour(
-        G: nx.Graph,
+        G: Union[nx.Graph, Dict[str, Dict[str, float]]],
         pd_pairs: List[Tuple[str, str]],
         tour_cost_fn: Callable[[List[str]], float],
         is_valid_tour_fn: Callable[[List[str]], bool],
@@ -190,7 +203,7 @@ class TourHeuristics:
         """Build tour by inserting pickup-delivery pairs in best positions.
         
         Args:
-            G: Metric graph with nodes and edge weights
+            G: Metric graph, or its weights[u][v] lookup
             pd_pairs: List of (pickup, delivery) tuples
             tour_cost_fn: Function to compute tour cost
             is_valid_tour_fn: Function to validate tour precedence constraints
@@ -200,8 +213,9 @@ class TourHeuristics:
             Tuple of (tour_sequence, tour_cost)
         """
         INF = float("inf")
+        dist = MetricGraphBuilder.weight_lookup(G)
         pickups = [p for p, _ in pd_pairs]
-        depot = start_node if start_node and start_node in G.nodes() else pickups[0]
+        depot = start_node if start_node and start_node in dist else pickups[0]
         
         # Start with first pickup-delivery pair
         if not pd_pairs:
@@ -211,49 +225,63 @@ class TourHeuristics:
         best_pair = None
         best_dist = INF
         for p, d in pd_pairs:
-            if p in G.nodes() and d in G.nodes():
-                dist = G[depot][p]["weight"] if depot != p else 0
-                if dist < best_dist:
-                    best_dist = dist
+            if p in dist and d in dist:
+                depot_dist = dist[depot][p] if depot != p else 0
+                if depot_dist < best_dist:
+                    best_dist = depot_dist
                     best_pair = (p, d)
         
         if not best_pair:
             return [], INF
         
         p0, d0 = best_pair
-        if start_node and start_node in G.nodes():
+        if start_node and start_node in dist:
             route = [start_node, p0, d0, start_node]
         else:
             route = [p0, d0, p0]
         
         remaining = [(p, d) for (p, d) in pd_pairs if (p, d) != best_pair 
-                    and p in G.nodes() and d in G.nodes()]
+                    and p in dist and d in dist]
         
-        # Insert remaining pairs at best positions
+        # Insert remaining pairs at best positions. Each candidate is scored from
+        # the few edges it changes; only candidates that beat the current best
+        # are built and validated.
         while remaining:
             best_insertion = None
             best_cost_increase = INF
             best_pair_idx = -1
             
             for pair_idx, (p, d) in enumerate(remaining):
+                p_row, d_row = dist[p], dist[d]
                 # Try inserting p and d at all valid positions
                 for i in range(1, len(route)):
+                    a, b = route[i - 1], route[i]
+                    ab = dist[a][b]
                     for j in range(i, len(route)):
                         # Insert p at position i, d at position j
+                        if j == i:
+                            # a -> p -> d -> b
+                            cost_increase = p_row[a] + p_row[d] + d_row[b] - ab
+                        else:
+                            # a -> p -> b ... c -> d -> e
+                            c, e = route[j - 1], route[j]
+                            cost_increase = (
+                                p_row[a] + p_row[b] - ab
+                                + d_row[c] + d_row[e] - dist[c][e]
+                            )
+                        
+                        if cost_increase >= best_cost_increase:
+                            continue
+                        
                         new_route = route[:i] + [p] + route[i:j] + [d] + route[j:]
                         
                         test_route = new_route[:-1] if new_route[0] == new_route[-1] else new_route
                         if not is_valid_tour_fn(test_route):
                             continue
                         
-                        new_cost = tour_cost_fn(new_route)
-                        old_cost = tour_cost_fn(route)
-                        cost_increase = new_cost - old_cost
-                        
-                        if cost_increase < best_cost_increase:
-                            best_cost_increase = cost_increase
-                            best_insertion = new_route
-                            best_pair_idx = pair_idx
+                        best_cost_increase = cost_increase
+                        best_insertion = new_route
+                        best_pair_idx = pair_idx
             
             if best_insertion is None:
                 # No valid insertion found, try to append remaining pairs while checking precedence
@@ -9,7 +9,11 @@ This module provides local search improvement methods including:
 
 import random
 import math
-from typing import List, Callable
+from typing import Dict, List, Callable, Optional
+
+# exp(-30) < 1e-13: moves worse than this many temperatures are rejected
+# outright instead of drawing against a vanishing acceptance probability
+ANNEALING_EXPONENT_CUTOFF = 30.0
 
 
 class LocalSearchOptimizer:
@@ -23,7 +27,10 @@ class LocalSearchOptimizer:
         max_neighborhood_size: int,
         closed: bool,
         temperature: float,
-        min_temperature: float
+        min_temperature: float,
+        current_cost: Optional[float] = None,
+        weights: Optional[Dict[str, Dict[str, float]]] = None,
+        delivery_map: Optional[Dict[str, str]] = None
     ) -> tuple[List[str], float, bool]:
         """Apply 2-opt local search operator.
         
@@ -35,44 +42,158 @@ class LocalSearchOptimizer:
             closed: Whether the tour should be closed
             temperature: Current simulated annealing temperature
             min_temperature: Minimum temperature threshold
+            current_cost: Known cost of `core`; recomputed with tour_cost_fn if omitted
+            weights: Symmetric edge weights (weights[u][v]) used to score moves in
+                O(1); read back from tour_cost_fn when omitted (see `_edge_weights`).
+                tour_cost_fn is only called on accepted moves, and the move is
+                judged on its real cost whenever that disagrees with the weights
+            delivery_map: Optional delivery -> pickup map enforced by
+                is_valid_tour_fn; when given and `core` is valid, moves are checked
+                against the pairs they touch instead of rescanning the tour
             
         Returns:
             Tuple of (new_core, new_cost, improved)
         """
         n = len(core)
-        total = tour_cost_fn(core + ([core[0]] if closed else []))
+        if current_cost is None:
+            total = tour_cost_fn(core + ([core[0]] if closed else []))
+        else:
+            total = current_cost
+        if weights is None:
+            weights = LocalSearchOptimizer._edge_weights(core, tour_cost_fn)
+        
+        # Without annealing only strict improvements are accepted, so the
+        # don't-look-bits descent can run straight to a local optimum.
+        if temperature <= min_temperature:
+            return LocalSearchOptimizer._two_opt_descent(
+                core, tour_cost_fn, is_valid_tour_fn, max_neighborhood_size,
+                closed, total, weights, delivery_map
+            )
+        
         improved = False
+        pos = LocalSearchOptimizer._precedence_positions(
+            core, is_valid_tour_fn, delivery_map
+        )
         
         for i in range(1, min(n - 2, n)):
             # Limit neighborhood size based on parameter
             max_j = min(n, i + max_neighborhood_size) if max_neighborhood_size > 0 else n
             
             for j in range(i + 2, max_j):
-                # Reverse segment [i:j]
-                new_core = core[:i] + list(reversed(core[i:j])) + core[j:]
+                delta = LocalSearchOptimizer._reversal_delta(core, i, j, weights)
+                if not LocalSearchOptimizer._annealing_accepts(delta, temperature):
+                    continue
                 
-                if not is_valid_tour_fn(new_core):
+                new_core = LocalSearchOptimizer._reversed_if_valid(
+                    core, i, j, pos, delivery_map, is_valid_tour_fn
+                )
+                if new_core is None:
                     continue
                 
                 new_seq = new_core + ([new_core[0]] if closed else [])
                 new_cost = tour_cost_fn(new_seq)
-                delta = new_cost - total
+                # The weight delta is exact only for symmetric weights: decide
+                # again on the real change when the two disagree
+                real_delta = new_cost - total
+                if abs(real_delta - delta) > 1e-9:
+                    delta = real_delta
+                    if not LocalSearchOptimizer._annealing_accepts(delta, temperature):
+                        continue
                 
-                # Accept if better OR with SA probability
-                accept = delta < -1e-9
-                if not accept and temperature > min_temperature:
-                    accept = random.random() < math.exp(-delta / temperature)
+                core = new_core
+                total = new_cost
+                improved = True
+                LocalSearchOptimizer._update_reversed_positions(pos, core, i, j)
                 
-                if accept:
-                    core = new_core
-                    total = new_cost
-                    improved = True
+                if delta < -1e-9:  # Real improvement
+                    break
+        
+        return core, total, improved
+
+    @staticmethod
+    def _annealing_accepts(delta: float, temperature: float) -> bool:
+        """Metropolis rule: take improvements, and worse moves with probability exp(-delta/T)."""
+        return delta < -1e-9 or (
+            delta < ANNEALING_EXPONENT_CUTOFF * temperature
+            and random.random() < math.exp(-delta / temperature)
+        )
+
+    @staticmethod
+    def _two_opt_descent(
+        core: List[str],
+        tour_cost_fn: Callable[[List[str]], float],
+        is_valid_tour_fn: Callable[[List[str]], bool],
+        max_neighborhood_size: int,
+        closed: bool,
+        total: float,
+        weights: Dict[str, Dict[str, float]],
+        delivery_map: Optional[Dict[str, str]] = None
+    ) -> tuple[List[str], float, bool]:
+        """Run strict-improvement 2-opt to a local optimum using don't-look bits.
+        
+        A node is marked "don't look" once scanning the moves that start at its
+        position finds no improving move, and is skipped on later passes. Nodes
+        whose improving moves were only rejected for precedence stay eligible,
+        since moves elsewhere can lift the conflict. The bit is cleared as soon
+        as an accepted move replaces an edge touching the node.
+        
+        Args:
+            core: Current tour (without closing edge if closed)
+            tour_cost_fn: Function to compute tour cost
+            is_valid_tour_fn: Function to validate precedence constraints
+            max_neighborhood_size: Maximum j-i distance to consider
+            closed: Whether the tour should be closed
+            total: Cost of `core`
+            weights: Symmetric edge weights used to skip non-improving moves
+                without building them
+            delivery_map: Optional delivery -> pickup map for incremental
+                precedence checks (see `two_opt_improvement`)
+            
+        Returns:
+            Tuple of (new_core, new_cost, improved)
+        """
+        n = len(core)
+        improved = False
+        dont_look = set()
+        pass_improved = True
+        pos = LocalSearchOptimizer._precedence_positions(
+            core, is_valid_tour_fn, delivery_map
+        )
+        
+        while pass_improved:
+            pass_improved = False
+            for i in range(1, n - 2):
+                if core[i] in dont_look:
+                    continue
+                max_j = min(n, i + max_neighborhood_size) if max_neighborhood_size > 0 else n
+                blocked = False
+                
+                for j in range(i + 2, max_j):
+                    if LocalSearchOptimizer._reversal_delta(core, i, j, weights) >= -1e-9:
+                        continue
+                    
+                    new_core = LocalSearchOptimizer._reversed_if_valid(
+                        core, i, j, pos, delivery_map, is_valid_tour_fn
+                    )
+                    if new_core is None:
+                        # A later move elsewhere may make this one valid
+                        blocked = True
+                        continue
                     
-                    if delta < -1e-9:  # Real improvement
+                    new_cost = tour_cost_fn(new_core + ([new_core[0]] if closed else []))
+                    if new_cost - total < -1e-9:
+                        # Endpoints of the two replaced edges may have new moves
+                        dont_look.difference_update(
+                            (core[i - 1], core[i], core[j - 1], core[j % n])
+                        )
+                        core = new_core
+                        total = new_cost
+                        improved = pass_improved = True
+                        LocalSearchOptimizer._update_reversed_positions(pos, core, i, j)
                         break
-            
-            if improved and temperature <= min_temperature:
-                break
+                else:
+                    if not blocked:
+                        dont_look.add(core[i])
         
         return core, total, improved
 
@@ -83,7 +204,10 @@ class LocalSearchOptimizer:
         is_valid_tour_fn: Callable[[List[str]], bool],
         closed: bool,
         temperature: float,
-        min_temperature: float
+        min_temperature: float,
+        current_cost: Optional[float] = None,
+        weights: Optional[Dict[str, Dict[str, float]]] = None,
+        delivery_map: Optional[Dict[str, str]] = None
     ) -> tuple[List[str], float, bool]:
         """Apply Or-Opt local search operator.
         
@@ -97,20 +221,34 @@ class LocalSearchOptimizer:
             closed: Whether the tour should be closed
             temperature: Current simulated annealing temperature
             min_temperature: Minimum temperature threshold
+            current_cost: Known cost of `core`; recomputed with tour_cost_fn if omitted
+            weights: Symmetric edge weights (weights[u][v]) used to score moves in
+                O(1); read back from tour_cost_fn when omitted (see `_edge_weights`).
+                tour_cost_fn is only called on accepted moves
+            delivery_map: Optional delivery -> pickup map enforced by
+                is_valid_tour_fn; when given and `core` is valid, moves are checked
+                against the pairs they touch instead of rescanning the tour
             
         Returns:
             Tuple of (new_core, new_cost, improved)
         """
         n = len(core)
-        total = tour_cost_fn(core + ([core[0]] if closed else []))
+        if current_cost is None:
+            total = tour_cost_fn(core + ([core[0]] if closed else []))
+        else:
+            total = current_cost
+        if weights is None:
+            weights = LocalSearchOptimizer._edge_weights(core, tour_cost_fn)
         improved = False
+        pos = LocalSearchOptimizer._precedence_positions(
+            core, is_valid_tour_fn, delivery_map
+        )
         
         for length in [1, 2]:
             if length >= n - 1:
                 continue
                 
             for i in range(1, n - length):
-                segment = core[i:i+length]
                 # Try only nearby positions for efficiency
                 positions = list(range(max(1, i - 4), min(n - length + 1, i + 5)))
                 
@@ -118,29 +256,41 @@ class LocalSearchOptimizer:
                     if j == i or (j > i and j < i + length):
                         continue
                     
-                    # Remove segment and insert at position j
-                    new_core = core[:i] + core[i+length:]
-                    insert_pos = j if j < i else j - length
-                    new_core = new_core[:insert_pos] + segment + new_core[insert_pos:]
+                    # Segment moves from (prev_a, next_b) to (x, y): 6 edges change
+                    prev_a, a = core[i - 1], core[i]
+                    b, next_b = core[i + length - 1], core[i + length]
+                    x = core[j - 1] if j < i or j > i + length else prev_a
+                    y = core[j]
+                    delta = (
+                        weights[prev_a][next_b] + weights[x][a] + weights[b][y]
+                        - weights[prev_a][a] - weights[b][next_b] - weights[x][y]
+                    )
+                    if not (delta < -1e-9 or (
+                        temperature > min_temperature
+                        and delta < ANNEALING_EXPONENT_CUTOFF * temperature
+                        and random.random() < math.exp(-delta / temperature)
+                    )):
+                        continue
                     
-                    if not is_valid_tour_fn(new_core):
+                    # Built from the current core: an annealing move may have
+                    # been accepted for an earlier j
+                    new_core = LocalSearchOptimizer._moved_if_valid(
+                        core, i, length, j, pos, delivery_map, is_valid_tour_fn
+                    )
+                    if new_core is None:
                         continue
                     
                     new_seq = new_core + ([new_core[0]] if closed else [])
                     new_cost = tour_cost_fn(new_seq)
-                    delta = new_cost - total
                     
-                    accept = delta < -1e-9
-                    if not accept and temperature > min_temperature:
-                        accept = random.random() < math.exp(-delta / temperature)
+                    core = new_core
+                    total = new_cost
+                    improved = True
+                    if pos is not None:
+                        pos = {node: k for k, node in enumerate(core)}
                     
-                    if accept:
-                        core = new_core
-                        total = new_cost
-                        improved = True
-                        
-                        if delta < -1e-9:
-                            break
+                    if delta < -1e-9:
+                        break
                 
                 if improved and temperature <= min_temperature:
                     break
@@ -150,6 +300,166 @@ class LocalSearchOptimizer:
         
         return core, total, improved
 
+    @staticmethod
+    def _edge_weights(
+        core: List[str],
+        tour_cost_fn: Callable[[List[str]], float]
+    ) -> Dict[str, Dict[str, float]]:
+        """Read the edge weights between the nodes of `core` back from tour_cost_fn.
+        
+        Used when callers do not pass `weights`; tour_cost_fn must sum the weights
+        of consecutive edges, so a two-node sequence costs exactly its edge.
+        
+        Returns:
+            Dict mapping each node of `core` to {other node: weight}
+        """
+        nodes = list(dict.fromkeys(core))
+        return {
+            u: {v: tour_cost_fn([u, v]) for v in nodes if v != u}
+            for u in nodes
+        }
+
+    @staticmethod
+    def _precedence_positions(
+        core: List[str],
+        is_valid_tour_fn: Callable[[List[str]], bool],
+        delivery_map: Optional[Dict[str, str]]
+    ) -> Optional[Dict[str, int]]:
+        """Return node positions for incremental precedence checks, if usable.
+        
+        The incremental checks only look at the pairs a move touches, so they
+        are exact only when `core` itself already respects precedence and visits
+        each node once.
+        
+        Returns:
+            Mapping of node -> index in `core`, or None to fall back to is_valid_tour_fn
+        """
+        if delivery_map is None or not is_valid_tour_fn(core):
+            return None
+        pos = {node: k for k, node in enumerate(core)}
+        return pos if len(pos) == len(core) else None
+
+    @staticmethod
+    def _reversal_delta(
+        core: List[str],
+        i: int,
+        j: int,
+        weights: Dict[str, Dict[str, float]]
+    ) -> float:
+        """Cost change of reversing core[i:j]: only edges (i-1, i) and (j-1, j) change."""
+        a, b, c, d = core[i - 1], core[i], core[j - 1], core[j]
+        return weights[a][c] + weights[b][d] - weights[a][b] - weights[c][d]
+
+    @staticmethod
+    def _update_reversed_positions(
+        pos: Optional[Dict[str, int]],
+        core: List[str],
+        i: int,
+        j: int
+    ) -> None:
+        """Refresh `pos` after core[i:j] was reversed; only that window moved."""
+        if pos is not None:
+            for k in range(i, j):
+                pos[core[k]] = k
+
+    @staticmethod
+    def _reversed_if_valid(
+        core: List[str],
+        i: int,
+        j: int,
+        pos: Optional[Dict[str, int]],
+        delivery_map: Optional[Dict[str, str]],
+        is_valid_tour_fn: Callable[[List[str]], bool]
+    ) -> Optional[List[str]]:
+        """Return a copy of `core` with core[i:j] reversed, or None if it breaks precedence.
+        
+        With `pos` (see `_precedence_positions`) only the pairs inside the window
+        are checked; otherwise the new tour is validated in full.
+        """
+        if pos is not None and not LocalSearchOptimizer._reversal_keeps_precedence(
+            core, i, j, pos, delivery_map
+        ):
+            return None
+        new_core = core[:]
+        new_core[i:j] = core[j - 1:i - 1:-1]
+        if pos is None and not is_valid_tour_fn(new_core):
+            return None
+        return new_core
+
+    @staticmethod
+    def _moved_if_valid(
+        core: List[str],
+        i: int,
+        length: int,
+        j: int,
+        pos: Optional[Dict[str, int]],
+        delivery_map: Optional[Dict[str, str]],
+        is_valid_tour_fn: Callable[[List[str]], bool]
+    ) -> Optional[List[str]]:
+        """Return `core` with core[i:i+length] moved before core[j], or None if it
+        breaks precedence.
+        
+        With `pos` (see `_precedence_positions`) only the pairs the segment jumps
+        over are checked; otherwise the new tour is validated in full.
+        """
+        if pos is not None and not LocalSearchOptimizer._move_keeps_precedence(
+            core, i, length, j, pos, delivery_map
+        ):
+            return None
+        segment = core[i:i + length]
+        new_core = core[:i] + core[i + length:]
+        insert_pos = j if j < i else j - length
+        new_core[insert_pos:insert_pos] = segment
+        if pos is None and not is_valid_tour_fn(new_core):
+            return None
+        return new_core
+
+    @staticmethod
+    def _reversal_keeps_precedence(
+        core: List[str],
+        i: int,
+        j: int,
+        pos: Dict[str, int],
+        delivery_map: Dict[str, str]
+    ) -> bool:
+        """Check that reversing core[i:j] keeps every pickup before its delivery.
+        
+        Only pairs with both ends inside the segment swap order, so it is enough
+        to look for a delivery in the segment whose pickup is also in it.
+        """
+        for node in core[i + 1:j]:
+            pickup = delivery_map.get(node)
+            if pickup is not None and pos[pickup] >= i:
+                return False
+        return True
+
+    @staticmethod
+    def _move_keeps_precedence(
+        core: List[str],
+        i: int,
+        length: int,
+        j: int,
+        pos: Dict[str, int],
+        delivery_map: Dict[str, str]
+    ) -> bool:
+        """Check that moving core[i:i+length] before core[j] keeps precedence.
+        
+        Only pairs between the segment and the nodes it jumps over can swap order.
+        """
+        if j < i:
+            # Segment moves earlier: none of its deliveries may jump their pickup
+            for node in core[i:i + length]:
+                pickup = delivery_map.get(node)
+                if pickup is not None and j <= pos[pickup] < i:
+                    return False
+        else:
+            # Segment moves later: none of its pickups may jump their delivery
+            for node in core[i + length:j]:
+                pickup = delivery_map.get(node)
+                if pickup is not None and i <= pos[pickup] < i + length:
+                    return False
+        return True
+
     @staticmethod
     def multi_start_local_search(
         initial_core: List[str],
@@ -161,7 +471,9 @@ class LocalSearchOptimizer:
         iterations_per_restart: int,
         use_simulated_annealing: bool,
         use_or_opt: bool,
-        strategy: str
+        strategy: str,
+        weights: Optional[Dict[str, Dict[str, float]]] = None,
+        delivery_map: Optional[Dict[str, str]] = None
     ) -> tuple[List[str], float]:
         """Multi-start local search with adaptive operators.
         
@@ -176,10 +488,15 @@ class LocalSearchOptimizer:
             use_simulated_annealing: Whether to use simulated annealing
             use_or_opt: Whether to use Or-Opt operator
             strategy: Strategy name ("fast", "balanced", or "focused")
+            weights: Symmetric edge weights passed on to the operators; read back
+                from tour_cost_fn once when omitted
+            delivery_map: Optional delivery -> pickup map passed on to the operators
             
         Returns:
             Tuple of (best_core, best_cost)
         """
+        if weights is None:
+            weights = LocalSearchOptimizer._edge_weights(initial_core, tour_cost_fn)
         best_core = list(initial_core)
         best_cost = initial_cost
         core = list(initial_core)
@@ -223,7 +540,8 @@ class LocalSearchOptimizer:
                 max_neighborhood = 15 if strategy == "focused" else 0
                 core, total, two_opt_improved = LocalSearchOptimizer.two_opt_improvement(
                     core, tour_cost_fn, is_valid_tour_fn, max_neighborhood,
-                    closed, temperature, min_temperature
+                    closed, temperature, min_temperature, total, weights,
+                    delivery_map
                 )
                 improved = improved or two_opt_improved
                 
@@ -234,7 +552,8 @@ class LocalSearchOptimizer:
                 if use_or_opt and (not improved or temperature > min_temperature):
                     core, total, or_opt_improved = LocalSearchOptimizer.or_opt_improvement(
                         core, tour_cost_fn, is_valid_tour_fn,
-                        closed, temperature, min_temperature
+                        closed, temperature, min_temperature, total, weights,
+                        delivery_map
                     )
                     improved = improved or or_opt_improved
                 
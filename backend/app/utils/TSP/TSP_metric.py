@@ -6,157 +6,228 @@ from directed shortest-path graphs.
 """
 
 import networkx as nx
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Tuple, Union
 
 
 class MetricGraphBuilder:
     """Builds symmetric metric complete graphs for TSP solving."""
 
     @staticmethod
-    def initialize_cost_matrix(graph: Dict, nodes: List[str]) -> Dict[str, Dict[str, float]]:
-        """Initialize cost matrix from graph entries.
+    def build_symmetric_cost_matrix(
+        graph: Dict,
+        nodes: List[str],
+        index: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[List[float]], List[List[int]]]:
+        """Build the symmetric cost matrix and mutual reachability in one sweep.
+        
+        Rows and columns follow the order of `nodes`. Each entry of `graph` is
+        written straight into both D[i][j] and D[j][i], keeping the minimum, so
+        D[i][j] = min(cost(i, j), cost(j, i)); the direction in which it is
+        finite is recorded, so no directed matrix or transposition is ever built.
+        Targets outside `nodes` are ignored and unparsable costs count as INF.
+        Two nodes are mutually reachable if both directions have a finite cost.
         
         Args:
             graph: Dictionary mapping source nodes to their target nodes and costs
             nodes: List of all nodes to include in the matrix
+            index: Optional precomputed {node: position in nodes} map
             
         Returns:
-            Dictionary C where C[u][v] is the cost from u to v.
+            Tuple of (symmetric matrix, adjacency lists where entry i holds the
+            indices of the nodes mutually reachable from i)
         """
         INF = float("inf")
-        C = {u: {v: (0.0 if u == v else INF) for v in nodes} for u in nodes}
+        n = len(nodes)
+        if index is None:
+            index = {u: i for i, u in enumerate(nodes)}
+        D = [[INF] * n for _ in range(n)]
+        for i in range(n):
+            D[i][i] = 0.0
+        # Bit 1: finite cost i -> j; bit 2: finite cost j -> i
+        finite = [[0] * n for _ in range(n)]
         
-        for u in nodes:
-            for v, info in graph.get(u, {}).items():
+        for u, targets in graph.items():
+            i = index.get(u)
+            if i is None:
+                continue
+            row = D[i]
+            finite_row = finite[i]
+            for v, info in targets.items():
+                j = index.get(v)
+                if j is None:
+                    continue
                 try:
                     c = float(info.get("cost", INF))
                 except Exception:
                     c = INF
-                if c < C[u].get(v, INF):
-                    C[u][v] = c
+                if c == INF:
+                    continue
+                finite_row[j] |= 1
+                finite[j][i] |= 2
+                if c < row[j]:
+                    row[j] = c
+                    D[j][i] = c
         
-        return C
+        adjacency = [
+            [j for j, bits in enumerate(finite_row) if bits == 3 and j != i]
+            for i, finite_row in enumerate(finite)
+        ]
+        return D, adjacency
 
     @staticmethod
-    def build_mutual_reachability_graph(
-        cost_matrix: Dict[str, Dict[str, float]], 
-        nodes: List[str]
-    ) -> Dict[str, Set[str]]:
-        """Build adjacency list for mutually reachable nodes.
+    def label_connected_components(
+        adjacency: List[List[int]]
+    ) -> List[int]:
+        """Label every node index with the connected component it belongs to.
         
-        Two nodes are mutually reachable if there's a finite-cost path in both directions.
+        Components are numbered in order of their smallest node index, with a
+        single breadth-first pass over the adjacency lists.
         
         Args:
-            cost_matrix: Cost matrix where cost_matrix[u][v] is cost from u to v
-            nodes: List of all nodes
+            adjacency: Adjacency lists indexed by node index
             
         Returns:
-            Dictionary mapping each node to its set of mutually reachable neighbors
+            List where entry i is the component label of node index i
         """
-        INF = float("inf")
-        adj_mutual = {u: set() for u in nodes}
+        labels = [-1] * len(adjacency)
+        label = 0
         
-        for u in nodes:
-            for v in nodes:
-                if u != v and cost_matrix[u][v] != INF and cost_matrix[v][u] != INF:
-                    adj_mutual[u].add(v)
+        for start in range(len(adjacency)):
+            if labels[start] != -1:
+                continue
+            
+            labels[start] = label
+            frontier = [start]
+            for node in frontier:
+                for neighbor in adjacency[node]:
+                    if labels[neighbor] == -1:
+                        labels[neighbor] = label
+                        frontier.append(neighbor)
+            label += 1
         
-        return adj_mutual
+        return labels
 
     @staticmethod
-    def find_connected_component(
-        start_node: str, 
-        adjacency: Dict[str, Set[str]], 
-        seen: Set[str]
-    ) -> Set[str]:
-        """Find connected component starting from start_node using DFS.
+    def build_symmetric_metric_graph(
+        sym_matrix: List[List[float]], 
+        nodes: List[str],
+        chosen: List[int]
+    ) -> nx.Graph:
+        """Build the metric graph induced by `chosen` on a symmetric cost matrix.
         
         Args:
-            start_node: Node to start the search from
-            adjacency: Adjacency list representation of the graph
-            seen: Set of already visited nodes (will be modified)
+            sym_matrix: Symmetric cost matrix (see `build_symmetric_cost_matrix`)
+            nodes: Node IDs in matrix order
+            chosen: Matrix indices of the nodes to include in the graph
             
         Returns:
-            Set of nodes in the connected component
+            NetworkX Graph with symmetric edge weights
         """
-        stack = [start_node]
-        component = set()
-        
-        while stack:
-            node = stack.pop()
-            if node in component:
-                continue
-            
-            component.add(node)
-            seen.add(node)
-            
-            for neighbor in adjacency.get(node, ()):
-                if neighbor not in component:
-                    stack.append(neighbor)
+        G = nx.Graph()
+        G.add_nodes_from(nodes[i] for i in chosen)
+        G.add_weighted_edges_from(
+            (nodes[i], nodes[j], float(sym_matrix[i][j]))
+            for a, i in enumerate(chosen)
+            for j in chosen[a + 1:]
+        )
         
-        return component
+        return G
 
     @staticmethod
-    def find_all_connected_components(
-        adjacency: Dict[str, Set[str]], 
-        nodes: List[str]
-    ) -> List[Set[str]]:
-        """Find all connected components in the adjacency graph.
+    def build_symmetric_metric_weights(
+        sym_matrix: List[List[float]],
+        nodes: List[str],
+        chosen: List[int]
+    ) -> Dict[str, Dict[str, float]]:
+        """Build the weights[u][v] lookup induced by `chosen` on a symmetric cost matrix.
         
         Args:
-            adjacency: Adjacency list representation of the graph
-            nodes: List of all nodes to consider
+            sym_matrix: Symmetric cost matrix (see `build_symmetric_cost_matrix`)
+            nodes: Node IDs in matrix order
+            chosen: Matrix indices of the nodes to include
             
         Returns:
-            List of sets, where each set contains nodes in a connected component
+            Dict mapping each chosen node to {other chosen node: weight}
         """
-        seen = set()
-        components = []
+        names = [nodes[i] for i in chosen]
+        weights = {}
+        for u, i in zip(names, chosen):
+            row = sym_matrix[i]
+            weights[u] = dict(zip(names, map(float, map(row.__getitem__, chosen))))
+            del weights[u][u]
         
-        for node in nodes:
-            if node not in seen:
-                component = MetricGraphBuilder.find_connected_component(
-                    node, adjacency, seen
-                )
-                components.append(component)
+        return weights
+
+    @staticmethod
+    def weight_lookup(
+        G: Union[nx.Graph, Dict[str, Dict[str, float]]]
+    ) -> Dict[str, Dict[str, float]]:
+        """Return the weights[u][v] lookup of a metric graph.
+        
+        A lookup that is already a plain mapping is returned unchanged, so
+        callers may pass either form.
         
-        return components
+        Args:
+            G: Metric graph, or its weights[u][v] lookup
+            
+        Returns:
+            Dict mapping each node to {neighbor: weight}
+        """
+        if isinstance(G, nx.Graph):
+            return {
+                u: {v: data["weight"] for v, data in nbrs.items()}
+                for u, nbrs in G.adjacency()
+            }
+        return G
 
     @staticmethod
-    def build_symmetric_metric_graph(
-        cost_matrix: Dict[str, Dict[str, float]], 
+    def _largest_mutual_component(
+        graph: Dict,
         nodes: List[str]
-    ) -> nx.Graph:
-        """Build symmetric graph by taking min(C[u][v], C[v][u]) for all node pairs.
+    ) -> Optional[Tuple[List[List[float]], List[int]]]:
+        """Return the symmetric matrix and the indices of its largest usable component.
         
         Args:
-            cost_matrix: Cost matrix with directed costs
-            nodes: List of nodes to include in the graph
+            graph: Dictionary with shortest path information between nodes
+            nodes: Node ordering of the matrix
             
         Returns:
-            NetworkX Graph with symmetric edge weights
+            Tuple of (symmetric matrix, chosen indices), or None when no component
+            has at least two nodes
         """
-        G = nx.Graph()
-        
-        for u in nodes:
-            G.add_node(u)
-        
-        for i, u in enumerate(nodes):
-            for v in nodes[i + 1:]:
-                weight = float(min(cost_matrix[u][v], cost_matrix[v][u]))
-                G.add_edge(u, v, weight=weight)
-        
-        return G
+        if not nodes:
+            return None
+
+        # Symmetric costs and mutual reachability in a single sweep of `graph`
+        sym_matrix, adj_mutual = MetricGraphBuilder.build_symmetric_cost_matrix(
+            graph, nodes
+        )
+
+        # Label connected components and select the largest one
+        labels = MetricGraphBuilder.label_connected_components(adj_mutual)
+        sizes = [0] * (max(labels) + 1)
+        for label in labels:
+            sizes[label] += 1
+        largest = sizes.index(max(sizes))
+        if sizes[largest] < 2:
+            return None
+
+        chosen = [i for i, label in enumerate(labels) if label == largest]
+        return sym_matrix, chosen
 
     @staticmethod
-    def build_metric_complete_graph(graph: Dict) -> nx.Graph:
+    def build_metric_complete_graph(
+        graph: Dict,
+        nodes: Optional[List[str]] = None
+    ) -> nx.Graph:
         """Build a symmetric metric complete graph from a directed sp_graph.
 
         Steps:
-        - Initialize directed cost matrix from `graph` entries.
-        - Build mutual reachability adjacency (nodes with finite costs both ways).
+        - In one sweep of `graph`, build the symmetric cost matrix
+          min(cost(u,v), cost(v,u)) and the mutual reachability adjacency
+          (nodes with finite costs both ways).
         - Select the largest mutually-reachable connected component.
-        - Symmetrize distances by taking min(cost(u,v), cost(v,u)) and return a NetworkX Graph.
+        - Return the metric restricted to that component as a NetworkX Graph.
 
         Unlike earlier code, this function will not raise on missing pairs; instead it
         restricts the metric to the largest mutually-reachable component so callers
@@ -164,36 +235,49 @@ class MetricGraphBuilder:
         
         Args:
             graph: Dictionary with shortest path information between nodes
+            nodes: Optional node ordering to reuse (the keys of `graph`); derived
+                from `graph` when omitted
             
         Returns:
             NetworkX Graph representing the symmetric metric
         """
-        nodes = list(graph.keys())
-        if not nodes:
+        if nodes is None:
+            nodes = list(graph.keys())
+        component = MetricGraphBuilder._largest_mutual_component(graph, nodes)
+        if component is None:
             return nx.Graph()
 
-        # Initialize cost matrix from graph
-        cost_matrix = MetricGraphBuilder.initialize_cost_matrix(graph, nodes)
-
-        # Build adjacency for mutual reachability
-        adj_mutual = MetricGraphBuilder.build_mutual_reachability_graph(
-            cost_matrix, nodes
-        )
-
-        # Find all connected components
-        components = MetricGraphBuilder.find_all_connected_components(
-            adj_mutual, nodes
+        sym_matrix, chosen = component
+        return MetricGraphBuilder.build_symmetric_metric_graph(
+            sym_matrix, nodes, chosen
         )
-        if not components:
-            return nx.Graph()
 
-        # Select the largest component
-        largest_component = max(components, key=len)
-        if len(largest_component) < 2:
-            return nx.Graph()
+    @staticmethod
+    def build_metric_weights(
+        graph: Dict,
+        nodes: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Build the same metric as `build_metric_complete_graph` as a weight lookup.
+        
+        The solver works on weights[u][v] directly, so this skips building the
+        NetworkX graph.
+        
+        Args:
+            graph: Dictionary with shortest path information between nodes
+            nodes: Optional node ordering to reuse (the keys of `graph`); derived
+                from `graph` when omitted
+            
+        Returns:
+            Dict mapping each node of the metric to {other node: weight}; empty
+            when no usable component exists
+        """
+        if nodes is None:
+            nodes = list(graph.keys())
+        component = MetricGraphBuilder._largest_mutual_component(graph, nodes)
+        if component is None:
+            return {}
 
-        # Build symmetric metric graph for the largest component
-        chosen_nodes = list(largest_component)
-        return MetricGraphBuilder.build_symmetric_metric_graph(
-            cost_matrix, chosen_nodes
+        sym_matrix, chosen = component
+        return MetricGraphBuilder.build_symmetric_metric_weights(
+            sym_matrix, nodes, chosen
         )
@@ -8,7 +8,9 @@ This module ties together all the TSP components:
 - Local search optimization (TSP_local_search)
 """
 
-from typing import Optional, List, Dict, cast, Tuple
+import heapq
+import itertools
+from typing import Optional, List, Dict, Tuple, Union
 
 import networkx as nx
 
@@ -76,15 +78,16 @@ class TSP(TSPBase):
         G_map, nodes_list, start_node = self._prepare_map_graph(nodes_list, start_node)
         
         # Compute pairwise shortest-paths among nodes of interest
-        sp_graph = self._compute_shortest_paths(G_map, nodes_list)
+        sp_graph = self._get_shortest_paths(G_map, nodes_list)
         
-        # Build symmetric metric among the requested nodes
-        G = MetricGraphBuilder.build_metric_complete_graph(sp_graph)
-        if G.number_of_nodes() == 0:
+        # Build symmetric metric among the requested nodes, reusing their ordering.
+        # The pipeline works on its weights[u][v] lookup, no NetworkX graph needed.
+        weights = MetricGraphBuilder.build_metric_weights(sp_graph, nodes_list)
+        if not weights:
             return [], 0.0
         
-        # Filter pickup-delivery pairs to those fully present in the metric graph
-        pd_pairs = [(p, d) for (p, d) in pd_pairs if p in G.nodes() and d in G.nodes()]
+        # Filter pickup-delivery pairs to those fully present in the metric
+        pd_pairs = [(p, d) for (p, d) in pd_pairs if p in weights and d in weights]
         if not pd_pairs:
             return [], 0.0
         
@@ -93,12 +96,12 @@ class TSP(TSPBase):
         deliveries = [d for _, d in pd_pairs]
         delivery_map = {d: p for p, d in pd_pairs if p in nodes_list and d in nodes_list}
         
-        tour_cost_fn = self._make_tour_cost_function(G)
+        tour_cost_fn = self._make_tour_cost_function(weights)
         is_valid_tour_fn = self._make_validation_function(delivery_map)
         
         # Generate initial solutions using heuristics
         tour_seq, total = self._generate_initial_tour(
-            G, pd_pairs, pickups, deliveries, delivery_map,
+            weights, pd_pairs, pickups, deliveries, delivery_map,
             tour_cost_fn, is_valid_tour_fn, start_node, params
         )
         
@@ -107,7 +110,8 @@ class TSP(TSPBase):
         
         # Apply local search optimization
         final_tour = self._optimize_tour(
-            tour_seq, total, tour_cost_fn, is_valid_tour_fn, params
+            tour_seq, total, tour_cost_fn, is_valid_tour_fn, params, weights,
+            delivery_map
         )
         
         return final_tour
@@ -143,14 +147,8 @@ class TSP(TSPBase):
             }
 
     def _extract_nodes_from_pairs(self, pd_pairs: List[Tuple[str, str]]) -> List[str]:
-        """Extract unique nodes from pickup-delivery pairs."""
-        nodes_list = []
-        for p, d in pd_pairs:
-            if p not in nodes_list:
-                nodes_list.append(p)
-            if d not in nodes_list:
-                nodes_list.append(d)
-        return nodes_list
+        """Extract unique nodes from pickup-delivery pairs, in first-seen order."""
+        return list(dict.fromkeys(node for pair in pd_pairs for node in pair))
 
     def _prepare_map_graph(self, nodes_list: List[str], start_node: Optional[str]):
         """Build map graph and validate nodes."""
@@ -176,16 +174,43 @@ class TSP(TSPBase):
         
         return G_map, nodes_list, start_node
 
+    def _get_shortest_paths(self, G_map: nx.DiGraph, nodes_list: List[str]) -> Dict:
+        """Return pairwise shortest paths among `nodes_list`, reusing recent tables.
+        
+        Solving a tour and expanding its route need the same table, and tours are
+        often solved again after small edits, so the last `_sp_cache_size` tables
+        are kept per node set while the same map graph object is used. A different
+        graph object drops them all; the map graph must not be modified in place
+        between calls.
+        """
+        cache = self._sp_graph_cache
+        if self._sp_cache_graph is not G_map:
+            cache.clear()
+            self._sp_cache_graph = G_map
+        
+        key = frozenset(nodes_list)
+        sp_graph = cache.get(key)
+        if sp_graph is not None:
+            cache.move_to_end(key)
+            return sp_graph
+        
+        sp_graph = self._compute_shortest_paths(G_map, nodes_list)
+        cache[key] = sp_graph
+        if len(cache) > self._sp_cache_size:
+            cache.popitem(last=False)
+        return sp_graph
+
     def _compute_shortest_paths(self, G_map: nx.DiGraph, nodes_list: List[str]) -> Dict:
         """Compute pairwise shortest paths among nodes of interest."""
+        # Plain successor dicts from the public adjacency iterator, shared by
+        # every search: indexing G_map.adj wraps every lookup in a view
+        succ = dict(G_map.adjacency())
         sp_graph = {}
         for src in nodes_list:
             try:
-                lengths_raw, paths_raw = nx.single_source_dijkstra(
-                    G_map, src, weight="weight"
+                lengths, paths = self._dijkstra_to_targets(
+                    G_map, src, nodes_list, succ=succ
                 )
-                lengths = cast(Dict[str, float], lengths_raw) if isinstance(lengths_raw, dict) else {}
-                paths = cast(Dict[str, List[str]], paths_raw) if isinstance(paths_raw, dict) else {}
             except Exception:
                 lengths = {}
                 paths = {}
@@ -197,30 +222,113 @@ class TSP(TSPBase):
                 }
         return sp_graph
 
-    def _make_tour_cost_function(self, G: nx.Graph):
-        """Create a function to compute tour cost on the metric graph."""
+    def _dijkstra_to_targets(
+        self,
+        G_map: nx.DiGraph,
+        src: str,
+        targets: List[str],
+        succ: Optional[Dict[str, Dict[str, Dict]]] = None,
+    ) -> Tuple[Dict[str, float], Dict[str, List[str]]]:
+        """Single-source Dijkstra that stops once every target is settled.
+        
+        Unlike `nx.single_source_dijkstra`, it neither explores the rest of the map
+        nor builds a path for every reached node: predecessors are recorded and
+        paths are rebuilt for the targets only. Edge weights are read from the
+        "weight" attribute (default 1), as networkx does.
+        
+        Args:
+            G_map: Directed map graph
+            src: Source node
+            targets: Nodes whose distances and paths are needed
+            succ: Successor dicts of G_map, as built from `G_map.adjacency()`;
+                built here when omitted. Pass it in when searching from several
+                sources so the map is copied only once
+            
+        Returns:
+            Tuple of (lengths, paths) for the reachable targets
+        """
+        if src not in G_map:
+            raise nx.NodeNotFound(f"Source {src} is not in G")
+        
+        if succ is None:
+            succ = dict(G_map.adjacency())
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        remaining = set(targets)
+        dist = {src: 0.0}
+        pred: Dict[str, str] = {}
+        settled = set()
+        counter = itertools.count()
+        heap = [(0.0, next(counter), src)]
+        
+        while heap and remaining:
+            d, _, u = heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            remaining.discard(u)
+            for v, data in succ[u].items():
+                nd = d + data.get("weight", 1)
+                if v not in settled and nd < dist.get(v, float("inf")):
+                    dist[v] = nd
+                    pred[v] = u
+                    heappush(heap, (nd, next(counter), v))
+        
+        lengths = {}
+        paths = {}
+        for tgt in targets:
+            if tgt not in settled:
+                continue
+            lengths[tgt] = dist[tgt]
+            path = [tgt]
+            while path[-1] != src:
+                path.append(pred[path[-1]])
+            path.reverse()
+            paths[tgt] = path
+        return lengths, paths
+
+    def _make_tour_cost_function(
+        self, G: Union[nx.Graph, Dict[str, Dict[str, float]]]
+    ):
+        """Create a function to compute tour cost on the metric graph.
+        
+        Costs are read from a flat weights[u][v] lookup (`G` itself, or one built
+        from the graph) instead of the graph's per-edge attribute dicts.
+        """
+        weights = MetricGraphBuilder.weight_lookup(G)
+        
         def tour_cost(seq: List[str]) -> float:
             if not seq or len(seq) < 2:
                 return 0.0
-            s = 0.0
-            for i in range(len(seq) - 1):
-                u, v = seq[i], seq[i + 1]
-                s += G[u][v]["weight"]
-            return s
+            return sum(weights[u][v] for u, v in itertools.pairwise(seq))
         return tour_cost
 
     def _make_validation_function(self, delivery_map: Dict[str, str]):
-        """Create a function to check if a tour respects pickup-before-delivery precedence."""
+        """Create a function to check if a tour respects pickup-before-delivery precedence.
+        
+        Each pickup and each delivery gets one bit, so a tour is validated in a
+        single left-to-right sweep: a delivery is only allowed once its pickup's
+        bit is set, and every delivery bit must be set by the end.
+        """
+        pickup_bits = {
+            p: 1 << k for k, p in enumerate(dict.fromkeys(delivery_map.values()))
+        }
+        delivery_bits = {
+            d: (1 << k, pickup_bits[p]) for k, (d, p) in enumerate(delivery_map.items())
+        }
+        all_delivered = (1 << len(delivery_map)) - 1
+        
         def is_valid_tour(seq: List[str]) -> bool:
-            for d, p in delivery_map.items():
-                try:
-                    idx_p = seq.index(p)
-                    idx_d = seq.index(d)
-                    if idx_p >= idx_d:
+            picked = 0
+            delivered = 0
+            for node in seq:
+                bits = delivery_bits.get(node)
+                if bits is not None:
+                    if not picked & bits[1]:
                         return False
-                except ValueError:
-                    return False
-            return True
+                    delivered |= bits[0]
+                picked |= pickup_bits.get(node, 0)
+            return delivered == all_delivered
         return is_valid_tour
 
     def _generate_initial_tour(
@@ -262,7 +370,10 @@ class TSP(TSPBase):
         candidate_tours.sort(key=lambda x: x[1])
         return candidate_tours[0]
 
-    def _optimize_tour(self, tour_seq, total, tour_cost_fn, is_valid_tour_fn, params):
+    def _optimize_tour(
+        self, tour_seq, total, tour_cost_fn, is_valid_tour_fn, params, weights=None,
+        delivery_map=None
+    ):
         """Apply local search optimization to improve the tour."""
         closed = len(tour_seq) >= 2 and tour_seq[0] == tour_seq[-1]
         core = tour_seq[:-1] if closed else list(tour_seq)
@@ -278,7 +389,7 @@ class TSP(TSPBase):
             core, total, tour_cost_fn, is_valid_tour_fn, closed,
             params["num_restarts"], params["iterations_per_restart"],
             params["use_simulated_annealing"], params["use_or_opt"],
-            params["strategy"]
+            params["strategy"], weights, delivery_map
         )
         
         # Re-close tour if needed
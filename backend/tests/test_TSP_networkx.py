@@ -21,10 +21,9 @@ class TestTSPInit:
 
 class TestBuildNetworkxMapGraph:
     @patch('app.services.XMLParser.XMLParser')
-    @patch('builtins.open')
-    def test_build_graph_with_valid_xml(self, mock_open, mock_parser):
-        # Mock XML content
-        mock_open.return_value.__enter__.return_value.read.return_value = '<map></map>'
+    def test_build_graph_with_valid_xml(self, mock_parser, tmp_path):
+        xml_file = tmp_path / 'test.xml'
+        xml_file.write_text('<map></map>', encoding='utf-8')
         
         # Mock parsed data
         mock_intersection1 = Mock(id='1')
@@ -38,16 +37,16 @@ class TestBuildNetworkxMapGraph:
         mock_parser.parse_map.return_value = mock_map_data
         
         tsp = TSP()
-        G, nodes = tsp._build_networkx_map_graph('test.xml')
+        G, nodes = tsp._build_networkx_map_graph(str(xml_file))
         
         assert isinstance(G, nx.DiGraph)
         assert '1' in nodes
         assert '2' in nodes
 
     @patch('app.services.XMLParser.XMLParser')
-    @patch('builtins.open')
-    def test_build_graph_filters_duplicate_edges(self, mock_open, mock_parser):
-        mock_open.return_value.__enter__.return_value.read.return_value = '<map></map>'
+    def test_build_graph_filters_duplicate_edges(self, mock_parser, tmp_path):
+        xml_file = tmp_path / 'test.xml'
+        xml_file.write_text('<map></map>', encoding='utf-8')
         
         mock_intersection1 = Mock(id='1')
         mock_intersection2 = Mock(id='2')
@@ -63,7 +62,7 @@ class TestBuildNetworkxMapGraph:
         mock_parser.parse_map.return_value = mock_map_data
         
         tsp = TSP()
-        G, nodes = tsp._build_networkx_map_graph('test.xml')
+        G, nodes = tsp._build_networkx_map_graph(str(xml_file))
         
         # Should keep smallest weight
         assert G['1']['2']['weight'] == 50.0
@@ -111,4 +111,46 @@ def test_parse_from_real_file(tmp_path: Path):
         road_segments = mp[1] if isinstance(mp, (list, tuple)) else getattr(mp, "road_segments", [])
 
     assert len(intersections) > 0
-    assert len(road_segments) > 0
\ No newline at end of file
+    assert len(road_segments) > 0
+
+
+def test_parse_map_resolves_troncons_listed_before_their_nodes():
+    xml = """<?xml version="1.0" encoding="UTF-8"?>
+<reseau>
+  <troncon origine="N1" destination="N2" longueur="50" nomRue="Rue Avant"/>
+  <noeud id="N1" latitude="45.0" longitude="4.0"/>
+  <noeud id="N2" latitude="45.1" longitude="4.1"/>
+</reseau>
+"""
+    mp = XMLParser.parse_map(xml)
+
+    assert [n.id for n in mp.intersections] == ["N1", "N2"]
+    assert len(mp.road_segments) == 1
+    seg = mp.road_segments[0]
+    assert (seg.start.id, seg.end.id) == ("N1", "N2")
+    assert seg.street_name == "Rue Avant"
+
+
+def test_parse_map_rejects_troncon_to_unknown_node():
+    xml = """<reseau>
+  <noeud id="N1" latitude="45.0" longitude="4.0"/>
+  <troncon origine="N1" destination="N9" longueur="50" nomRue="Rue"/>
+</reseau>"""
+    with pytest.raises(ValueError):
+        XMLParser.parse_map(xml)
+
+
+def test_parse_map_ignores_elements_nested_below_root_children():
+    xml = """<reseau>
+  <noeud id="N1" latitude="45.0" longitude="4.0"/>
+  <noeud id="N2" latitude="45.1" longitude="4.1"/>
+  <extra>
+    <noeud id="N3" latitude="45.2" longitude="4.2"/>
+    <troncon origine="N1" destination="N3" longueur="10" nomRue="Cachee"/>
+  </extra>
+  <troncon origine="N1" destination="N2" longueur="50" nomRue="Rue"/>
+</reseau>"""
+    mp = XMLParser.parse_map(xml)
+
+    assert [n.id for n in mp.intersections] == ["N1", "N2"]
+    assert [(s.start.id, s.end.id) for s in mp.road_segments] == [("N1", "N2")]
@@ -1,6 +1,8 @@
 import types
+from collections import OrderedDict
 from types import SimpleNamespace
 import networkx as nx
+import pytest
 
 from app.utils.TSP.TSP_base import TSPBase
 from app.utils.TSP.TSP_solver import TSP
@@ -57,11 +59,181 @@ def test_compute_shortest_paths_handles_dijkstra_exception(monkeypatch):
     # Prepare a tiny graph
     G = nx.DiGraph()
     G.add_node('A')
-    # Monkeypatch networkx single_source_dijkstra to raise
-    import networkx as nx_mod
-    monkeypatch.setattr(nx_mod, 'single_source_dijkstra', lambda *args, **kwargs: (_ for _ in ()).throw(Exception('boom')))
+    # Monkeypatch the per-source Dijkstra to raise
+    monkeypatch.setattr(TSP, '_dijkstra_to_targets', lambda *args, **kwargs: (_ for _ in ()).throw(Exception('boom')))
 
     sp = tsp._compute_shortest_paths(G, ['A'])
     assert 'A' in sp
     assert sp['A']['A']['path'] == ['A']
     assert sp['A']['A']['cost'] == 0.0
+
+
+def test_build_networkx_map_graph_reuses_parsed_file_until_modified(monkeypatch, tmp_path):
+    import os
+
+    fake_map = SimpleNamespace(
+        intersections=['N1', 'N2'],
+        road_segments=[SimpleNamespace(start='N1', end='N2', length_m=5.0, street_name='Main')]
+    )
+    calls = []
+
+    def fake_parse(xml_text):
+        calls.append(xml_text)
+        return fake_map
+
+    from app.services.XMLParser import XMLParser
+    monkeypatch.setattr(XMLParser, 'parse_map', fake_parse, raising=True)
+
+    xml_file = tmp_path / 'cached.xml'
+    xml_file.write_text('<map></map>', encoding='utf-8')
+
+    G1, nodes1 = TSPBase()._build_networkx_map_graph(str(xml_file))
+    G2, nodes2 = TSPBase()._build_networkx_map_graph(str(xml_file))
+    assert len(calls) == 1
+    assert G2 is G1 and nodes2 == nodes1
+
+    # A newer modification time invalidates the cached graph
+    stat = os.stat(xml_file)
+    os.utime(xml_file, (stat.st_atime, stat.st_mtime + 10))
+    G3, _ = TSPBase()._build_networkx_map_graph(str(xml_file))
+    assert len(calls) == 2
+    assert G3 is not G1
+    # Only the newest version of the file stays cached
+    cached_paths = [key[0] for key in TSPBase._xml_cache]
+    assert cached_paths.count(os.path.abspath(xml_file)) == 1
+
+
+def test_build_networkx_map_graph_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        TSPBase()._build_networkx_map_graph(str(tmp_path / 'missing.xml'))
+
+
+def test_build_networkx_map_graph_cache_is_bounded(monkeypatch, tmp_path):
+    fake_map = SimpleNamespace(intersections=['N1'], road_segments=[])
+    from app.services.XMLParser import XMLParser
+    monkeypatch.setattr(XMLParser, 'parse_map', lambda xml_text: fake_map, raising=True)
+    monkeypatch.setattr(TSPBase, '_xml_cache', OrderedDict())
+    monkeypatch.setattr(TSPBase, '_xml_cache_size', 2)
+
+    paths = []
+    for name in ('a.xml', 'b.xml', 'c.xml'):
+        xml_file = tmp_path / name
+        xml_file.write_text('<map></map>', encoding='utf-8')
+        paths.append(str(xml_file))
+
+    TSPBase()._build_networkx_map_graph(paths[0])
+    TSPBase()._build_networkx_map_graph(paths[1])
+    # A hit makes the first file the most recently used one
+    TSPBase()._build_networkx_map_graph(paths[0])
+    TSPBase()._build_networkx_map_graph(paths[2])
+
+    assert [key[0] for key in TSPBase._xml_cache] == [paths[0], paths[2]]
+
+
+def test_shortest_paths_are_reused_for_the_same_map_and_nodes(monkeypatch):
+    G = nx.DiGraph()
+    G.add_weighted_edges_from([('A', 'B', 1.0), ('B', 'C', 2.0), ('C', 'A', 3.0)])
+    calls = []
+    real_dijkstra = TSP._dijkstra_to_targets
+
+    def counting_dijkstra(self, G_map, src, targets, succ=None):
+        calls.append(src)
+        return real_dijkstra(self, G_map, src, targets, succ=succ)
+
+    monkeypatch.setattr(TSP, '_dijkstra_to_targets', counting_dijkstra)
+    tsp = TSP()
+    sp = tsp._get_shortest_paths(G, ['A', 'B', 'C'])
+    assert len(calls) == 3
+
+    # same graph and node set (in any order): no new Dijkstra runs
+    assert tsp._get_shortest_paths(G, ['C', 'A', 'B']) is sp
+    assert len(calls) == 3
+
+    # another node set or another graph object is recomputed
+    tsp._get_shortest_paths(G, ['A', 'B'])
+    tsp._get_shortest_paths(G.copy(), ['A', 'B'])
+    assert len(calls) == 7
+
+
+def test_shortest_path_cache_keeps_recent_node_sets(monkeypatch):
+    G = nx.DiGraph()
+    G.add_weighted_edges_from([('A', 'B', 1.0), ('B', 'C', 2.0), ('C', 'A', 3.0)])
+    calls = []
+    real_dijkstra = TSP._dijkstra_to_targets
+
+    def counting_dijkstra(self, G_map, src, targets, succ=None):
+        calls.append(src)
+        return real_dijkstra(self, G_map, src, targets, succ=succ)
+
+    monkeypatch.setattr(TSP, '_dijkstra_to_targets', counting_dijkstra)
+    tsp = TSP()
+    tsp._sp_cache_size = 2
+    tsp._get_shortest_paths(G, ['A', 'B'])
+    tsp._get_shortest_paths(G, ['B', 'C'])
+    assert len(calls) == 4
+
+    # both tables are still cached; 'A','B' becomes the most recent
+    tsp._get_shortest_paths(G, ['A', 'B'])
+    assert len(calls) == 4
+
+    # a third node set evicts the least recently used one ('B','C')
+    tsp._get_shortest_paths(G, ['A', 'C'])
+    tsp._get_shortest_paths(G, ['A', 'B'])
+    assert len(calls) == 6
+    tsp._get_shortest_paths(G, ['B', 'C'])
+    assert len(calls) == 8
+
+
+def test_shortest_path_table_copies_the_map_adjacency_once():
+    calls = []
+
+    class CountingDiGraph(nx.DiGraph):
+        def adjacency(self):
+            calls.append(1)
+            return super().adjacency()
+
+    G = CountingDiGraph()
+    G.add_weighted_edges_from([('A', 'B', 1.0), ('B', 'C', 2.0), ('C', 'A', 3.0)])
+    sp = TSP()._compute_shortest_paths(G, ['A', 'B', 'C'])
+
+    assert len(calls) == 1
+    assert sp['A']['C'] == {'path': ['A', 'B', 'C'], 'cost': 3.0}
+
+
+def test_dijkstra_to_targets_matches_networkx():
+    G = nx.DiGraph()
+    G.add_weighted_edges_from([
+        ('A', 'B', 1.0), ('B', 'C', 1.0), ('A', 'C', 5.0),
+        ('C', 'D', 2.0), ('D', 'A', 1.0), ('B', 'E', 10.0),
+    ])
+    G.add_edge('E', 'F')  # no weight attribute: counts as 1, like networkx
+    lengths, paths = TSP()._dijkstra_to_targets(G, 'A', ['C', 'F', 'A', 'Z'])
+
+    nx_lengths, nx_paths = nx.single_source_dijkstra(G, 'A', weight='weight')
+    assert lengths == {t: nx_lengths[t] for t in ('C', 'F', 'A')}
+    assert paths == {t: nx_paths[t] for t in ('C', 'F', 'A')}
+
+
+def test_shortest_paths_prefer_cheaper_indirect_route():
+    G = nx.DiGraph()
+    G.add_edge("A", "B", weight=10.0)
+    G.add_edge("B", "C", weight=20.0)
+    G.add_edge("A", "C", weight=50.0)  # longer direct path
+
+    sp_graph = TSP()._get_shortest_paths(G, ["A", "B", "C"])
+
+    assert sp_graph["A"]["B"]["cost"] == 10.0
+    # A -> C goes through B (30.0), not direct (50.0)
+    assert sp_graph["A"]["C"]["cost"] == 30.0
+    assert sp_graph["A"]["C"]["path"] == ["A", "B", "C"]
+
+
+def test_shortest_paths_mark_unreachable_nodes_as_infinite():
+    G = nx.DiGraph()
+    G.add_edge("A", "B", weight=10.0)
+    G.add_node("C")  # disconnected node
+
+    sp_graph = TSP()._get_shortest_paths(G, ["A", "B", "C"])
+
+    assert sp_graph["A"]["C"]["cost"] == float("inf")
+    assert sp_graph["A"]["C"]["path"] is None
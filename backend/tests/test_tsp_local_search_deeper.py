@@ -131,3 +131,180 @@ def test_tsp_generate_initial_tour_uses_heuristics():
     )
     assert isinstance(route, list)
     assert isinstance(cost, float)
+
+
+def test_operators_reuse_known_current_cost():
+    core = ['A', 'B', 'C', 'D']
+    weight_map = {(u, v): 1.0 for u in core for v in core if u != v}
+    base_cost = make_weighted_cost(weight_map)
+    calls = []
+
+    def counting_cost(seq):
+        calls.append(list(seq))
+        return base_cost(seq)
+
+    total = base_cost(core + [core[0]])
+    for operator, args in (
+        (LocalSearchOptimizer.two_opt_improvement, (0, True, 0.0, 0.0)),
+        (LocalSearchOptimizer.or_opt_improvement, (True, 0.0, 0.0)),
+    ):
+        calls.clear()
+        operator(core[:], counting_cost, always_valid, *args)
+        without_cost = len(calls)
+
+        calls.clear()
+        _, cost, improved = operator(
+            core[:], counting_cost, always_valid, *args, current_cost=total
+        )
+        # the known cost replaces the initial full evaluation of the tour
+        assert len(calls) == without_cost - 1
+        assert cost == total and improved is False
+
+
+def test_two_opt_descent_reaches_local_optimum_in_one_call():
+    # Points on a line visited in a scrambled order; 2-opt untangles it fully
+    positions = {'N0': 0, 'N1': 1, 'N2': 2, 'N3': 3, 'N4': 4, 'N5': 5}
+    weight_map = {
+        (u, v): float(abs(positions[u] - positions[v]))
+        for u in positions for v in positions if u != v
+    }
+    cost_fn = make_weighted_cost(weight_map)
+    core = ['N0', 'N3', 'N1', 'N4', 'N2', 'N5']
+
+    new_core, new_cost, improved = LocalSearchOptimizer.two_opt_improvement(
+        core[:], cost_fn, always_valid, 0, False, 0.0, 0.0
+    )
+    assert improved is True
+    assert new_cost == 5.0
+    assert new_core == ['N0', 'N1', 'N2', 'N3', 'N4', 'N5']
+
+    # A second call from the optimum finds nothing left to improve
+    again_core, again_cost, again_improved = LocalSearchOptimizer.two_opt_improvement(
+        new_core[:], cost_fn, always_valid, 0, False, 0.0, 0.0
+    )
+    assert again_improved is False
+    assert again_core == new_core and again_cost == new_cost
+
+
+def test_weights_score_moves_without_full_tour_evaluations():
+    positions = {'N0': 0, 'N1': 1, 'N2': 2, 'N3': 3, 'N4': 4, 'N5': 5, 'N6': 6}
+    weights = {
+        u: {v: float(abs(positions[u] - positions[v])) for v in positions if v != u}
+        for u in positions
+    }
+    calls = []
+    base_cost = make_weighted_cost(
+        {(u, v): w for u, nbrs in weights.items() for v, w in nbrs.items()}
+    )
+
+    def counting_cost(seq):
+        calls.append(list(seq))
+        return base_cost(seq)
+
+    core = ['N0', 'N4', 'N1', 'N5', 'N2', 'N6', 'N3']
+    total = counting_cost(core + [core[0]])
+    for operator, args in (
+        (LocalSearchOptimizer.two_opt_improvement, (0, True, 0.0, 0.0)),
+        (LocalSearchOptimizer.or_opt_improvement, (True, 0.0, 0.0)),
+    ):
+        calls.clear()
+        plain = operator(core[:], counting_cost, always_valid, *args, total)
+        plain_calls = len(calls)
+
+        calls.clear()
+        scored = operator(core[:], counting_cost, always_valid, *args, total, weights)
+        # same result: without weights they are first read back from
+        # tour_cost_fn, otherwise only accepted moves reach it
+        assert scored == plain
+        assert len(calls) > 0
+        assert plain_calls - len(calls) == len(core) * (len(core) - 1)
+
+
+def test_delivery_map_replaces_full_precedence_rescans():
+    positions = {'S': 0, 'P0': 4, 'D0': 1, 'P1': 2, 'D1': 5, 'P2': 3, 'D2': 6}
+    weight_map = {
+        (u, v): float(abs(positions[u] - positions[v]))
+        for u in positions for v in positions if u != v
+    }
+    cost_fn = make_weighted_cost(weight_map)
+    delivery_map = {'D0': 'P0', 'D1': 'P1', 'D2': 'P2'}
+    validate = TSP()._make_validation_function(delivery_map)
+    checks = []
+
+    def counting_valid(seq):
+        checks.append(list(seq))
+        return validate(seq)
+
+    core = ['S', 'P0', 'D0', 'P2', 'P1', 'D2', 'D1']
+    for operator, args in (
+        (LocalSearchOptimizer.two_opt_improvement, (0, True, 0.0, 0.0)),
+        (LocalSearchOptimizer.or_opt_improvement, (True, 0.0, 0.0)),
+    ):
+        checks.clear()
+        plain = operator(core[:], cost_fn, counting_valid, *args)
+        plain_checks = len(checks)
+
+        checks.clear()
+        fast = operator(
+            core[:], cost_fn, counting_valid, *args, delivery_map=delivery_map
+        )
+        assert fast == plain and validate(fast[0])
+        # only the starting tour is validated in full
+        assert len(checks) == 1 < plain_checks
+
+
+def test_annealing_two_opt_checks_real_cost_for_asymmetric_weights():
+    # Forward edges along the core are cheap and backward ones expensive, so
+    # the symmetric reversal delta badly underestimates every reversal
+    core = [f'N{k}' for k in range(8)]
+    rng = random.Random(3)
+    weight_map = {}
+    for a in range(8):
+        for b in range(8):
+            if a != b:
+                weight_map[(core[a], core[b])] = (
+                    rng.uniform(1, 20) if a < b else rng.uniform(100, 200)
+                )
+    cost = make_weighted_cost(weight_map)
+    start_cost = cost(core)
+
+    for seed in range(20):
+        random.seed(seed)
+        new_core, new_cost, _ = LocalSearchOptimizer.two_opt_improvement(
+            core[:], cost, always_valid, max_neighborhood_size=0, closed=False,
+            temperature=1e-3, min_temperature=1e-6,
+        )
+        # At such a low temperature no worse tour can be accepted
+        assert new_cost == cost(new_core)
+        assert new_cost <= start_cost + 1e-9
+
+
+def test_descent_retries_moves_rejected_for_precedence():
+    # Swapping N1/N2 and N6/N7 both pay off, but the first swap only becomes
+    # valid once N7 precedes N6, which does not touch N1's edges
+    core = [f'N{k}' for k in range(10)]
+    weights = {u: {v: 10.0 for v in core if v != u} for u in core}
+
+    def set_weight(a, b, w):
+        weights[a][b] = weights[b][a] = w
+
+    for a, b in zip(core, core[1:]):
+        set_weight(a, b, 1.0)
+    for a, b, w in [('N0', 'N1', 50.0), ('N2', 'N3', 50.0), ('N0', 'N2', 1.0),
+                    ('N1', 'N3', 1.0), ('N5', 'N6', 50.0), ('N7', 'N8', 50.0),
+                    ('N5', 'N7', 1.0), ('N6', 'N8', 1.0)]:
+        set_weight(a, b, w)
+
+    def cost(seq):
+        return sum(weights[a][b] for a, b in zip(seq, seq[1:]))
+
+    def valid(seq):
+        return seq.index('N1') == 1 or seq.index('N7') < seq.index('N6')
+
+    new_core, new_cost, improved = LocalSearchOptimizer._two_opt_descent(
+        core[:], cost, valid, 3, False, cost(core), weights
+    )
+
+    assert improved
+    assert new_core[:3] == ['N0', 'N2', 'N1']
+    assert new_cost == cost(new_core) == 27.0
@@ -82,45 +82,6 @@ class TestTSPService:
         # Should have infinite weight for invalid length
         assert G["1"]["2"]["weight"] == float("inf")
 
-    def test_build_sp_graph(self):
-        """Test _build_sp_graph creates shortest path graph"""
-        service = TSPService()
-        
-        # Create a simple graph
-        G = nx.DiGraph()
-        G.add_edge("A", "B", weight=10.0)
-        G.add_edge("B", "C", weight=20.0)
-        G.add_edge("A", "C", weight=50.0)  # Longer direct path
-        
-        sp_graph = service._build_sp_graph(G, ["A", "B", "C"])
-        
-        assert "A" in sp_graph
-        assert "B" in sp_graph["A"]
-        assert "C" in sp_graph["A"]
-        
-        # Cost from A to B should be direct edge
-        assert sp_graph["A"]["B"]["cost"] == 10.0
-        
-        # Cost from A to C should be via B (30.0), not direct (50.0)
-        assert sp_graph["A"]["C"]["cost"] == 30.0
-        
-        # Path from A to C should go through B
-        assert sp_graph["A"]["C"]["path"] == ["A", "B", "C"]
-
-    def test_build_sp_graph_with_unreachable_nodes(self):
-        """Test _build_sp_graph handles unreachable nodes"""
-        service = TSPService()
-        
-        # Create graph with disconnected node
-        G = nx.DiGraph()
-        G.add_edge("A", "B", weight=10.0)
-        G.add_node("C")  # Disconnected node
-        
-        sp_graph = service._build_sp_graph(G, ["A", "B", "C"])
-        
-        # Cost to unreachable node should be inf
-        assert sp_graph["A"]["C"]["cost"] == float("inf")
-
     def test_compute_tours_no_map(self):
         """Test compute_tours raises error when no map is loaded"""
         service = TSPService()
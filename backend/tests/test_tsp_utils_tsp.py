@@ -118,3 +118,107 @@ def test_tsp_solver_helpers():
     G.add_edge('A','B', weight=1.0)
     sp = tsp._compute_shortest_paths(G, ['A','B'])
     assert 'A' in sp and 'B' in sp
+
+
+def test_cost_matrix_is_dense_and_symmetrized():
+    from app.utils.TSP.TSP_metric import MetricGraphBuilder
+
+    inf = float('inf')
+    graph = {
+        'A': {'A': {'cost': 0.0}, 'B': {'cost': 5.0}, 'Z': {'cost': 1.0}},
+        'B': {'A': {'cost': 3.0}, 'C': {'cost': 'bad'}},
+        'C': {'A': {'cost': 7.0}},
+    }
+    nodes = ['A', 'B', 'C']
+    D, adjacency = MetricGraphBuilder.build_symmetric_cost_matrix(graph, nodes)
+    # unknown targets ('Z') are ignored, unparsable costs stay INF, and each
+    # pair keeps its cheaper direction
+    assert D == [[0.0, 3.0, 7.0], [3.0, 0.0, inf], [7.0, inf, 0.0]]
+    # only A and B have finite costs both ways
+    assert adjacency == [[1], [0], []]
+
+
+def test_symmetric_matrix_keeps_cheaper_direction_and_mutual_pairs():
+    from app.utils.TSP.TSP_metric import MetricGraphBuilder
+
+    graph = {
+        'A': {'A': {'cost': 0.0}, 'B': {'cost': 5.0}, 'C': {'cost': 2.0}},
+        'B': {'A': {'cost': 3.0}, 'C': {'cost': 'bad'}},
+        'C': {'A': {'cost': 7.0}, 'B': {'cost': 1.0}},
+    }
+    nodes = ['A', 'B', 'C']
+    sym, adjacency = MetricGraphBuilder.build_symmetric_cost_matrix(graph, nodes)
+    # B -> C is unusable, so C -> B alone sets their symmetric cost
+    assert sym == [[0.0, 3.0, 2.0], [3.0, 0.0, 1.0], [2.0, 1.0, 0.0]]
+    # but B and C are not mutually reachable: only A is linked to both
+    assert adjacency == [[1, 2], [0], [0]]
+
+
+def test_metric_weights_match_metric_graph():
+    from app.utils.TSP.TSP_metric import MetricGraphBuilder
+
+    inf = float('inf')
+    sp_graph = {
+        'A': {'A': {'cost': 0.0}, 'B': {'cost': 4.0}, 'C': {'cost': 2.0}, 'D': {'cost': inf}},
+        'B': {'A': {'cost': 3.0}, 'B': {'cost': 0.0}, 'C': {'cost': 6.0}, 'D': {'cost': 1.0}},
+        'C': {'A': {'cost': 2.5}, 'B': {'cost': 5.0}, 'C': {'cost': 0.0}, 'D': {'cost': inf}},
+        'D': {'A': {'cost': inf}, 'B': {'cost': inf}, 'C': {'cost': inf}, 'D': {'cost': 0.0}},
+    }
+    weights = MetricGraphBuilder.build_metric_weights(sp_graph)
+    G = MetricGraphBuilder.build_metric_complete_graph(sp_graph)
+    # D is only reachable one way, so it is left out of both forms
+    assert weights == MetricGraphBuilder.weight_lookup(G)
+    assert weights['A'] == {'B': 3.0, 'C': 2.0}
+    assert MetricGraphBuilder.weight_lookup(weights) is weights
+
+
+def test_components_are_labelled_in_one_pass():
+    from app.utils.TSP.TSP_metric import MetricGraphBuilder
+
+    adjacency = [[2], [], [0, 3], [2], [5], [4]]
+    labels = MetricGraphBuilder.label_connected_components(adjacency)
+    assert labels == [0, 1, 0, 0, 2, 2]
+
+
+def test_insertion_places_pairs_at_cheapest_valid_positions():
+    positions = {'S': 0, 'P0': 1, 'D0': 4, 'P1': 2, 'D1': 3}
+    G = nx.Graph()
+    for u in positions:
+        for v in positions:
+            if u < v:
+                G.add_edge(u, v, weight=float(abs(positions[u] - positions[v])))
+    pd_pairs = [('P0', 'D0'), ('P1', 'D1')]
+
+    def partial_valid(seq):
+        pos = {node: k for k, node in enumerate(seq)}
+        return all(pos[p] < pos[d] for p, d in pd_pairs if p in pos and d in pos)
+
+    tsp = TSP()
+    route, cost = TourHeuristics.build_insertion_tour(
+        G, pd_pairs, tsp._make_tour_cost_function(G), partial_valid, start_node='S'
+    )
+    # P1/D1 fit between P0 and D0 on the line at no extra cost
+    assert route == ['S', 'P0', 'P1', 'D1', 'D0', 'S']
+    assert cost == 8.0
+
+
+def test_nearest_neighbor_respects_precedence():
+    G = nx.Graph()
+    # D1 is closest to every node but can only follow its pickup P1
+    weights = {('P0', 'D1'): 1.0, ('P0', 'P1'): 5.0, ('P0', 'D0'): 6.0,
+               ('P1', 'D1'): 1.0, ('P1', 'D0'): 2.0, ('D0', 'D1'): 1.0}
+    for (u, v), w in weights.items():
+        G.add_edge(u, v, weight=w)
+
+    pickups = ['P0', 'P1']
+    deliveries = ['D0', 'D1']
+    delivery_map = {'D0': 'P0', 'D1': 'P1'}
+    tsp = TSP()
+    tour, cost = TourHeuristics.build_nearest_neighbor_tour(
+        G, pickups, deliveries, delivery_map,
+        tsp._make_tour_cost_function(G), tsp._make_validation_function(delivery_map)
+    )
+
+    assert tour[0] == tour[-1]
+    assert tour.index('P1') < tour.index('D1')
+    assert tour.index('P0') < tour.index('D0')